@@ -1,8 +1,24 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from types import MappingProxyType
+from typing import NamedTuple
 import os
 
+# ----------------------------
+# MEDIA FILES
+# ----------------------------
+# Resolve media paths once at import time so every rerun doesn't stat the
+# filesystem, and so the app works regardless of the current working directory.
+_HERE = os.path.dirname(__file__)
+VIDEO_PATH = os.path.join(_HERE, "video.mp4")
+IMAGE_PATH = os.path.join(_HERE, "image.jpg")
+VIDEO_PRESENT = os.path.isfile(VIDEO_PATH)
+IMAGE_PRESENT = os.path.isfile(IMAGE_PATH)
+
 # ----------------------------
 # PAGE CONFIGURATION
 # ----------------------------
@@ -28,23 +44,23 @@ col1, col2 = st.columns(2)
 
 # Add video to first column
 with col1:
-    if os.path.exists("video.mp4"):
-        st.video("video.mp4")
+    if VIDEO_PRESENT:
+        st.video(VIDEO_PATH)
     else:
         st.warning("Video file not found")
 
 # Add image to second column with updated parameter
 with col2:
-    if os.path.exists("image.jpg"):
-        st.image("image.jpg", caption="Carbon Footprint Pledge", use_column_width=True)
+    if IMAGE_PRESENT:
+        st.image(IMAGE_PATH, caption="Carbon Footprint Pledge", use_column_width=True)
     else:
         st.warning("Image file not found")
 
 # ----------------------------
 # EMISSION FACTORS
 # ----------------------------
-# African grid emission factors
-COUNTRY_GRID_MIX = {
+# African grid emission factors (read-only lookup table)
+COUNTRY_GRID_MIX = MappingProxyType({
     "Select Country": 0.0,
     "Nigeria (Gas-dominated)": 0.55,
     "South Africa (Coal-dominated)": 0.9,
@@ -53,10 +69,10 @@ COUNTRY_GRID_MIX = {
     "Egypt (Gas-dominated)": 0.6,
     "Ethiopia (Hydro-dominated)": 0.05,
     "General Sub-Saharan Africa Avg": 0.48
-}
+})
 
-# Global emission factors
-GLOBAL_EMISSION_FACTORS = {
+# Global emission factors (read-only lookup table)
+GLOBAL_EMISSION_FACTORS = MappingProxyType({
     # Housing (kg CO2e per unit per month)
     "electricity": 0.5,    
     "natural_gas": 2.0,     
@@ -78,141 +94,249 @@ GLOBAL_EMISSION_FACTORS = {
     "diet_vegan": 1.2,
     # LPG
     "lpg_per_kg": 3.0
+})
+
+
+class AnnualFactors(NamedTuple):
+    """Annualized emission factors, folded once at module load. A NamedTuple
+    makes the values immutable and turns hot lookups into attribute access."""
+    electricity: float
+    natural_gas: float
+    heating_oil: float
+    propane: float
+    lpg_per_kg: float
+    car_gasoline: float
+    motorcycle: float
+    bus: float
+    train: float
+    flight_hour: float
+
+
+ANNUAL_FACTORS = AnnualFactors(
+    # Monthly usage -> yearly
+    electricity=GLOBAL_EMISSION_FACTORS["electricity"] * 12,
+    natural_gas=GLOBAL_EMISSION_FACTORS["natural_gas"] * 12,
+    heating_oil=GLOBAL_EMISSION_FACTORS["heating_oil"] * 12,
+    propane=GLOBAL_EMISSION_FACTORS["propane"] * 12,
+    lpg_per_kg=GLOBAL_EMISSION_FACTORS["lpg_per_kg"] * 12,
+    # Weekly distance -> yearly
+    car_gasoline=GLOBAL_EMISSION_FACTORS["car_gasoline"] * 52,
+    motorcycle=GLOBAL_EMISSION_FACTORS["motorcycle"] * 52,
+    bus=GLOBAL_EMISSION_FACTORS["bus"] * 52,
+    train=GLOBAL_EMISSION_FACTORS["train"] * 52,
+    # Flight hours -> yearly (assumes ~500 miles per hour flown)
+    flight_hour=500 * GLOBAL_EMISSION_FACTORS["plane_short"],
+)
+
+# Daily diet factors -> yearly
+DIET_ANNUAL = {k: v * 365 for k, v in GLOBAL_EMISSION_FACTORS.items() if k.startswith("diet_")}
+
+# Diet selectbox labels -> annual kg CO2e, merged so the calculation engine
+# does a single lookup instead of label -> factor key -> daily factor.
+DIET_ANNUAL_BY_LABEL = {
+    "Typical (Staples + some meat)": DIET_ANNUAL["diet_typical"],
+    "Meat regularly": DIET_ANNUAL["diet_meat_regular"],
+    "Meat-Heavy": DIET_ANNUAL["diet_meat_heavy"],
+    "Average": DIET_ANNUAL["diet_average"],
+    "Vegetarian": DIET_ANNUAL["diet_vegetarian"],
+    "Vegan": DIET_ANNUAL["diet_vegan"],
 }
 
+# Parallel (input key, display label, annual factor) tables per region so the
+# breakdown is one vectorized multiply instead of a chain of scalar ones.
+GLOBAL_KEYS = ("electricity_kwh", "natural_gas_therms", "heating_oil_liters",
+               "propane_liters", "car_miles_week", "bus_miles_week",
+               "train_miles_week", "flight_hours")
+GLOBAL_LABELS = ("Housing: Electricity", "Housing: Natural Gas",
+                 "Housing: Heating Oil", "Housing: Propane", "Transport: Car",
+                 "Transport: Bus", "Transport: Train", "Transport: Flights")
+GLOBAL_FACTORS = np.array([ANNUAL_FACTORS.electricity, ANNUAL_FACTORS.natural_gas,
+                           ANNUAL_FACTORS.heating_oil, ANNUAL_FACTORS.propane,
+                           ANNUAL_FACTORS.car_gasoline, ANNUAL_FACTORS.bus,
+                           ANNUAL_FACTORS.train, ANNUAL_FACTORS.flight_hour],
+                          dtype=np.float64)
+
+# Electricity is excluded here because its factor depends on the selected
+# country's grid mix; it is handled separately in the calculation engine.
+AFRICA_KEYS = ("lpg_kg_per_month", "car_km_week", "moto_km_week",
+               "bus_km_week", "flight_hours")
+AFRICA_LABELS = ("Housing: Cooking (LPG)", "Transport: Car",
+                 "Transport: Motorcycle", "Transport: Bus/Minibus",
+                 "Transport: Flights")
+AFRICA_FACTORS = np.array([ANNUAL_FACTORS.lpg_per_kg, ANNUAL_FACTORS.car_gasoline,
+                           ANNUAL_FACTORS.motorcycle, ANNUAL_FACTORS.bus,
+                           ANNUAL_FACTORS.flight_hour],
+                          dtype=np.float64)
+
+# ----------------------------
+# RECOMMENDATION RULES
+# ----------------------------
+# (category, threshold kg, message, estimated yearly saving kg, predicate)
+# The optional predicate receives (region, data) for rules that depend on
+# more than the category's emissions. Adding a rule means adding a row here,
+# not another branch in the display code.
+RECOMMENDATION_RULES = [
+    ("Transport: Car", 2000,
+     "**🚗 Reduce car travel by 20%.** Use public transport, bike, or carpool just one day a week.",
+     400, None),
+    ("Housing: Electricity", 1500,
+     "**💡 Switch to energy-efficient appliances** and LED bulbs. Consider solar if available.",
+     500, None),
+    ("Housing: Cooking (LPG)", 500,
+     "**🔥 Improve cooking efficiency.** Use a pressure cooker or hotbox to reduce LPG consumption.",
+     100, lambda region, data: region == "africa"),
+    ("Diet", 2000,
+     "**🍽️ Reduce meat consumption.** Try having one meat-free day per week.",
+     200, lambda region, data: "Meat" in data["diet"]),
+]
+
 # ----------------------------
 # CALCULATION ENGINE
 # ----------------------------
+@st.cache_data(show_spinner=False)
 def calculate_carbon_footprint(data, region="global"):
     """
     Calculates the annual carbon footprint (kg CO2e) based on user input.
     Handles both global and African regional calculations.
+    Memoized so unrelated widget reruns reuse the previous result.
     """
-    total_kg_co2 = 0
     breakdown = {}
 
-    # Housing Calculations
+    # Housing & Transport Calculations (vectorized over the region's table)
     if region == "africa":
         grid_factor = COUNTRY_GRID_MIX[data["country"]]
         breakdown["Housing: Electricity"] = data["electricity_kwh"] * grid_factor * 12
-        if "lpg_kg_per_month" in data:
-            breakdown["Housing: Cooking (LPG)"] = data["lpg_kg_per_month"] * GLOBAL_EMISSION_FACTORS["lpg_per_kg"] * 12
+        keys, labels, factors = AFRICA_KEYS, AFRICA_LABELS, AFRICA_FACTORS
     else:
-        breakdown["Housing: Electricity"] = data["electricity_kwh"] * GLOBAL_EMISSION_FACTORS["electricity"] * 12
-        breakdown["Housing: Natural Gas"] = data.get("natural_gas_therms", 0) * GLOBAL_EMISSION_FACTORS["natural_gas"] * 12
-        breakdown["Housing: Heating Oil"] = data.get("heating_oil_liters", 0) * GLOBAL_EMISSION_FACTORS["heating_oil"] * 12
-        breakdown["Housing: Propane"] = data.get("propane_liters", 0) * GLOBAL_EMISSION_FACTORS["propane"] * 12
+        keys, labels, factors = GLOBAL_KEYS, GLOBAL_LABELS, GLOBAL_FACTORS
 
-    # Transport Calculations
-    if region == "africa":
-        breakdown["Transport: Car"] = (data.get("car_km_week", 0) * 52) * GLOBAL_EMISSION_FACTORS["car_gasoline"]
-        breakdown["Transport: Motorcycle"] = (data.get("moto_km_week", 0) * 52) * GLOBAL_EMISSION_FACTORS["motorcycle"]
-        breakdown["Transport: Bus/Minibus"] = (data.get("bus_km_week", 0) * 52) * GLOBAL_EMISSION_FACTORS["bus"]
-    else:
-        breakdown["Transport: Car"] = data.get("car_miles_week", 0) * GLOBAL_EMISSION_FACTORS["car_gasoline"] * 52
-        breakdown["Transport: Bus"] = data.get("bus_miles_week", 0) * GLOBAL_EMISSION_FACTORS["bus"] * 52
-        breakdown["Transport: Train"] = data.get("train_miles_week", 0) * GLOBAL_EMISSION_FACTORS["train"] * 52
-    
-    breakdown["Transport: Flights"] = data["flight_hours"] * 500 * GLOBAL_EMISSION_FACTORS["plane_short"]
+    vals = np.fromiter((data.get(k, 0) for k in keys), dtype=np.float64, count=len(keys))
+    breakdown.update(zip(labels, (vals * factors).tolist()))
 
     # Diet Calculation
-    diet_map = {
-        "Typical (Staples + some meat)": "diet_typical",
-        "Meat regularly": "diet_meat_regular",
-        "Meat-Heavy": "diet_meat_heavy",
-        "Average": "diet_average",
-        "Vegetarian": "diet_vegetarian",
-        "Vegan": "diet_vegan"
-    }
-    
-    diet_key = diet_map[data["diet"]]
-    breakdown["Diet"] = GLOBAL_EMISSION_FACTORS[diet_key] * 365
+    breakdown["Diet"] = DIET_ANNUAL_BY_LABEL[data["diet"]]
 
     total_kg_co2 = sum(breakdown.values())
     return total_kg_co2, breakdown
 
+
+@st.cache_data(show_spinner=False)
+def build_breakdown_results(breakdown_items):
+    """
+    Builds the breakdown DataFrame and a combined pie + bar figure from a
+    tuple of (category, value) pairs. Zero-emission categories are dropped so
+    the charts (and the JSON shipped to the browser) only carry real slices.
+    Both views share one Plotly figure, so the browser bootstraps a single
+    renderer and receives a single payload. Memoized so neither is rebuilt
+    on unrelated reruns.
+    """
+    items = [(k, v) for k, v in breakdown_items if v > 0]
+    breakdown_df = pd.DataFrame(items, columns=['Category', 'Emissions (kg)']).set_index('Category')
+    categories = breakdown_df.index
+    values = breakdown_df['Emissions (kg)']
+    fig = make_subplots(rows=1, cols=2, specs=[[{"type": "domain"}, {"type": "xy"}]])
+    fig.add_trace(go.Pie(labels=categories, values=values,
+                         textposition='inside', textinfo='percent+label',
+                         marker_colors=px.colors.sequential.Emrld),
+                  row=1, col=1)
+    fig.add_trace(go.Bar(x=categories, y=values,
+                         marker_color=px.colors.sequential.Emrld[0],
+                         showlegend=False),
+                  row=1, col=2)
+    fig.update_layout(title='Breakdown of Your Carbon Footprint')
+    fig.update_yaxes(title_text='Emissions (kg)', row=1, col=2)
+    return breakdown_df, fig
+
 # ----------------------------
 # USER INPUT SECTION
 # ----------------------------
 st.header("📊 Your Lifestyle")
 
-# Region Selection
+# Region Selection (kept outside the form: it decides which input set renders)
 region = st.radio("Select your region:", ["Global", "Africa"], horizontal=True)
 
 input_data = {}
 
-if region.lower() == "africa":
-    col1, col2 = st.columns(2)
-    with col1:
-        input_data["country"] = st.selectbox(
-            "Select your country", 
-            options=list(COUNTRY_GRID_MIX.keys()), 
-            help="This sets the carbon intensity of your electricity grid."
-        )
-    with col2:
-        if input_data["country"] != "Select Country":
-            factor = COUNTRY_GRID_MIX[input_data["country"]]
-            st.metric(label="Your Grid's Carbon Intensity", value=f"{factor} kg CO₂/kWh")
-
-    with st.expander("🏠 Housing & Cooking"):
-        input_data["electricity_kwh"] = st.slider("Monthly electricity usage (kWh)", 0, 600, 100, 
-            help="Many households use less than 100 kWh. Think lights, fan, TV, fridge.")
-        
-        st.markdown("**Cooking Gas (LPG)**")
-        cylinder_size = st.selectbox(
-            "What size is your primary gas cylinder?",
-            options=[3, 6, 12, 15, 45],
-            format_func=lambda x: f"{x} kg",
-            help="The size is usually written on the cylinder."
-        )
-        cylinder_quantity = st.slider(
-            f"How many {cylinder_size} kg cylinders do you use per month?",
-            min_value=0.0, max_value=10.0, value=0.5, step=0.5,
-            help="E.g., 0.5 means one cylinder lasts you two months."
-        )
-        input_data["lpg_kg_per_month"] = cylinder_size * cylinder_quantity
-        st.caption(f"➡️ You use **{input_data['lpg_kg_per_month']} kg** of LPG per month.")
-
-    with st.expander("🚗 Transport"):
-        input_data["car_km_week"] = st.slider("Kilometers driven per week (personal car)", 0, 400, 0)
-        input_data["moto_km_week"] = st.slider("Kilometers per week (motorcycle taxi or own)", 0, 200, 0)
-        input_data["bus_km_week"] = st.slider("Kilometers per week (Bus, Matatu, Troski)", 0, 300, 50)
-        input_data["flight_hours"] = st.slider("Hours flown per year", 0, 50, 0)
-
-    with st.expander("🍽️ Diet"):
-        input_data["diet"] = st.selectbox(
-            "Which diet best describes you?",
-            ("Typical (Staples + some meat)", "Meat regularly", "Vegetarian", "Vegan"),
-            help="'Typical' reflects a diet based on cassava, yam, rice, beans, with fish or meat a few times a week."
-        )
-
-else:  # Global calculator
-    with st.expander("🏠 Housing", expanded=True):
-        input_data["electricity_kwh"] = st.slider("Monthly electricity usage (kWh)", 0, 2000, 300, help="Check your utility bill.")
-        input_data["natural_gas_therms"] = st.slider("Monthly natural gas usage (therms)", 0, 200, 40, help="1 therm ≈ 100 cubic feet.")
-        input_data["heating_oil_liters"] = st.slider("Monthly heating oil usage (liters)", 0, 500, 0)
-        input_data["propane_liters"] = st.slider("Monthly propane usage (liters)", 0, 500, 0)
-
-    with st.expander("🚗 Transport"):
-        input_data["car_miles_week"] = st.slider("Miles driven per week (car)", 0, 500, 100)
-        input_data["flight_hours"] = st.slider("Hours flown per year", 0, 100, 5, help="Round-trip NY to LA is ~10 hours.")
-        input_data["bus_miles_week"] = st.slider("Miles traveled per week (bus)", 0, 500, 20)
-        input_data["train_miles_week"] = st.slider("Miles traveled per week (train)", 0, 500, 10)
-
-    with st.expander("🍽️ Diet"):
-        input_data["diet"] = st.selectbox(
-            "Which diet best describes you?",
-            ("Meat-Heavy", "Average", "Vegetarian", "Vegan"),
-            help="Diet has a significant impact on your carbon footprint."
-        )
+# All lifestyle inputs live in a form so dragging a slider doesn't trigger a
+# full script rerun; nothing reruns until the user submits.
+with st.form("eco_inputs"):
+    if region.lower() == "africa":
+        col1, col2 = st.columns(2)
+        with col1:
+            input_data["country"] = st.selectbox(
+                "Select your country",
+                options=list(COUNTRY_GRID_MIX.keys()),
+                help="This sets the carbon intensity of your electricity grid."
+            )
+        with col2:
+            if input_data["country"] != "Select Country":
+                factor = COUNTRY_GRID_MIX[input_data["country"]]
+                st.metric(label="Your Grid's Carbon Intensity", value=f"{factor} kg CO₂/kWh")
+
+        with st.expander("🏠 Housing & Cooking"):
+            input_data["electricity_kwh"] = st.slider("Monthly electricity usage (kWh)", 0, 600, 100,
+                help="Many households use less than 100 kWh. Think lights, fan, TV, fridge.")
+
+            st.markdown("**Cooking Gas (LPG)**")
+            cylinder_size = st.selectbox(
+                "What size is your primary gas cylinder?",
+                options=[3, 6, 12, 15, 45],
+                format_func=lambda x: f"{x} kg",
+                help="The size is usually written on the cylinder."
+            )
+            cylinder_quantity = st.slider(
+                f"How many {cylinder_size} kg cylinders do you use per month?",
+                min_value=0.0, max_value=10.0, value=0.5, step=0.5,
+                help="E.g., 0.5 means one cylinder lasts you two months."
+            )
+            input_data["lpg_kg_per_month"] = cylinder_size * cylinder_quantity
+            st.caption(f"➡️ You use **{input_data['lpg_kg_per_month']} kg** of LPG per month.")
+
+        with st.expander("🚗 Transport"):
+            input_data["car_km_week"] = st.slider("Kilometers driven per week (personal car)", 0, 400, 0)
+            input_data["moto_km_week"] = st.slider("Kilometers per week (motorcycle taxi or own)", 0, 200, 0)
+            input_data["bus_km_week"] = st.slider("Kilometers per week (Bus, Matatu, Troski)", 0, 300, 50)
+            input_data["flight_hours"] = st.slider("Hours flown per year", 0, 50, 0)
+
+        with st.expander("🍽️ Diet"):
+            input_data["diet"] = st.selectbox(
+                "Which diet best describes you?",
+                ("Typical (Staples + some meat)", "Meat regularly", "Vegetarian", "Vegan"),
+                help="'Typical' reflects a diet based on cassava, yam, rice, beans, with fish or meat a few times a week."
+            )
+
+    else:  # Global calculator
+        with st.expander("🏠 Housing", expanded=True):
+            input_data["electricity_kwh"] = st.slider("Monthly electricity usage (kWh)", 0, 2000, 300, help="Check your utility bill.")
+            input_data["natural_gas_therms"] = st.slider("Monthly natural gas usage (therms)", 0, 200, 40, help="1 therm ≈ 100 cubic feet.")
+            input_data["heating_oil_liters"] = st.slider("Monthly heating oil usage (liters)", 0, 500, 0)
+            input_data["propane_liters"] = st.slider("Monthly propane usage (liters)", 0, 500, 0)
+
+        with st.expander("🚗 Transport"):
+            input_data["car_miles_week"] = st.slider("Miles driven per week (car)", 0, 500, 100)
+            input_data["flight_hours"] = st.slider("Hours flown per year", 0, 100, 5, help="Round-trip NY to LA is ~10 hours.")
+            input_data["bus_miles_week"] = st.slider("Miles traveled per week (bus)", 0, 500, 20)
+            input_data["train_miles_week"] = st.slider("Miles traveled per week (train)", 0, 500, 10)
+
+        with st.expander("🍽️ Diet"):
+            input_data["diet"] = st.selectbox(
+                "Which diet best describes you?",
+                ("Meat-Heavy", "Average", "Vegetarian", "Vegan"),
+                help="Diet has a significant impact on your carbon footprint."
+            )
+
+    # ----------------------------
+    # CALCULATE BUTTON
+    # ----------------------------
+    calculate_button = st.form_submit_button("🔄 Calculate My Footprint", type="primary")
 
-# ----------------------------
-# CALCULATE BUTTON
-# ----------------------------
-calculate_button = st.button("🔄 Calculate My Footprint", type="primary")
 valid_input = True if region != "Africa" or (region == "Africa" and input_data.get("country") != "Select Country") else False
 
-if calculate_button and valid_input:
+# Key identifying the current inputs, so results stay on screen across
+# reruns and the charts are only rebuilt when the inputs actually change.
+results_key = (region, tuple(sorted(input_data.items())))
+
+if (calculate_button and valid_input) or st.session_state.get("last_key") == results_key:
     total_emissions, breakdown_dict = calculate_carbon_footprint(input_data, region.lower())
     total_tons = total_emissions / 1000
 
@@ -245,39 +369,29 @@ if calculate_button and valid_input:
         col3.metric("Vs. US Average", f"{comparison:+.1f} tons", 
                    help="US average is ~16 tons per person per year.")
 
-    # Create visualization
-    breakdown_df = pd.DataFrame(list(breakdown_dict.items()), columns=['Category', 'Emissions (kg)'])
-    fig = px.pie(breakdown_df, values='Emissions (kg)', names='Category', 
-                 title='Breakdown of Your Carbon Footprint',
-                 color_discrete_sequence=px.colors.sequential.Emrld)
-    fig.update_traces(textposition='inside', textinfo='percent+label')
+    # Create visualization, reusing the stored figure when inputs are unchanged
+    if st.session_state.get("last_key") == results_key and "fig" in st.session_state:
+        fig = st.session_state["fig"]
+    else:
+        breakdown_df, fig = build_breakdown_results(tuple(breakdown_dict.items()))
+        st.session_state["last_key"] = results_key
+        st.session_state["fig"] = fig
+        st.session_state["breakdown_df"] = breakdown_df
     st.plotly_chart(fig, use_container_width=True)
 
-    st.bar_chart(breakdown_df.set_index('Category'))
-
     # ----------------------------
     # RECOMMENDATIONS
     # ----------------------------
     st.header("💡 Your Personalized Reduction Plan")
     st.info("Based on your largest sources of emissions, here's how you can make the biggest impact:")
 
-    recommendations = []
-
-    # Transport recommendations
-    if breakdown_dict.get("Transport: Car", 0) > 2000:
-        recommendations.append(("**🚗 Reduce car travel by 20%.** Use public transport, bike, or carpool just one day a week.", 400))
-
-    # Housing recommendations
-    if breakdown_dict.get("Housing: Electricity", 0) > 1500:
-        recommendations.append(("**💡 Switch to energy-efficient appliances** and LED bulbs. Consider solar if available.", 500))
-
-    # Cooking recommendations (Africa-specific)
-    if region.lower() == "africa" and breakdown_dict.get("Housing: Cooking (LPG)", 0) > 500:
-        recommendations.append(("**🔥 Improve cooking efficiency.** Use a pressure cooker or hotbox to reduce LPG consumption.", 100))
-
-    # Diet recommendations
-    if breakdown_dict.get("Diet", 0) > 2000 and "Meat" in input_data["diet"]:
-        recommendations.append(("**🍽️ Reduce meat consumption.** Try having one meat-free day per week.", 200))
+    region_key = region.lower()
+    recommendations = [
+        (message, saving)
+        for category, threshold, message, saving, predicate in RECOMMENDATION_RULES
+        if breakdown_dict.get(category, 0) > threshold
+        and (predicate is None or predicate(region_key, input_data))
+    ]
 
     # Sort and display recommendations
     recommendations.sort(key=lambda x: x[1], reverse=True)